@@ -1,9 +1,12 @@
 __all__ = [
     "config",
     "utils",
+    "cache",
     "github_http",
     "evidence",
+    "rules_data",
     "rules",
+    "hints",
     "analyzer",
     "miner",
     "cli",
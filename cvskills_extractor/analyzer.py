@@ -1,14 +1,78 @@
 from __future__ import annotations
-import re, math, json, pathlib, datetime, xml.etree.ElementTree as ET
-from typing import Any, Dict, List, Optional, Tuple
+import re, math, json, hashlib, pathlib, tarfile, datetime, functools, xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import tomllib
 
 from .github_http import GitHubHTTP
 from .evidence import SkillIndex
-from .rules import SkillRules
-from .config import LANG_MIN_FRACTION, LANG_BASE, LANG_SLOPE
-from .utils import is_excluded, utcnow
+from .rules_data import PY_DEP_LOOKUP, JS_DEP_LOOKUP, PY_DEP_KEYS, JS_DEP_KEYS, map_language
+from .hints import match_file_hints
+from .config import LANG_MIN_FRACTION, LANG_BASE, LANG_SLOPE, K8S_MAX_MANIFESTS, K8S_MAX_BYTES, K8S_SCAN_CHARS, TARBALL_MIN_FILES, FILE_FETCH_WORKERS
+from .utils import path_excluder, utcnow_ns
+
+# Nom de paquet = tout ce qui précède le premier spécificateur de version/extra/espace
+_REQ_SPLIT = re.compile(r"[<>=\[\](),\s]")
+
+# apiVersion et kind en une seule passe
+_K8S_KEYS = re.compile(r"\b(apiVersion|kind):\s")
+# Dossiers typiques de manifests K8s (chemin déjà en minuscules)
+_K8S_PATH_RE = re.compile(r"k8s/|manifests/|deploy|charts/|helm/")
+
+_JS_DEP_SECTIONS = ("dependencies", "devDependencies", "peerDependencies")
+
+# Manifests recopiés d'un template à l'autre: un contenu identique n'est parsé qu'une fois.
+# lru_cache indexe déjà par le hash de la chaîne ; les résultats partagés sont en lecture seule.
+@functools.lru_cache(maxsize=512)
+def parse_toml(content: str) -> Dict[str, Any]:
+    return tomllib.loads(content)
+
+@functools.lru_cache(maxsize=512)
+def parse_json(content: str) -> Any:
+    return json.loads(content)
+
+def looks_like_k8s(content: str) -> bool:
+    seen = set()
+    for m in _K8S_KEYS.finditer(content, 0, K8S_SCAN_CHARS):
+        seen.add(m.group(1))
+        if len(seen) == 2:
+            return True
+    return False
+
+def pom_artifact_ids(content: str, chunk: int = 65536) -> Iterator[str]:
+    # Lecture en flux des <artifactId> de <dependency> ; l'appelant peut s'arrêter au premier trouvé
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack: List[str] = []
+    for i in range(0, len(content), chunk):
+        parser.feed(content[i:i+chunk])
+        for event, elem in parser.read_events():
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if event == "start":
+                stack.append(tag)
+                continue
+            stack.pop()
+            if tag == "artifactId" and stack and stack[-1] == "dependency":
+                yield elem.text or ""
+            elem.clear()
+    parser.close()
+
+@functools.lru_cache(maxsize=512)
+def pom_uses_spring_boot(content: str) -> bool:
+    # pom.xml de template (parent/starters identiques) : verdict mémorisé, XML invalide compris
+    try:
+        return any("spring-boot" in name.lower() for name in pom_artifact_ids(content))
+    except ET.ParseError:
+        return False
+
+@functools.cache
+def analysis_fingerprint() -> str:
+    # Empreinte des sources du paquet (règles, indices, config…) : toute modification invalide le cache des repos
+    h = hashlib.sha1()
+    for f in sorted(pathlib.Path(__file__).parent.glob("*.py")):
+        h.update(f.name.encode("utf-8"))
+        h.update(f.read_bytes())
+    return h.hexdigest()
 
 class RepoAnalyzer:
     def __init__(self, gh: GitHubHTTP, owner: str, repo_meta: Dict[str, Any]):
@@ -17,13 +81,25 @@ class RepoAnalyzer:
         self.repo = repo_meta["name"]
         self.meta = repo_meta
         self.default_branch = repo_meta.get("default_branch","main")
+        self.sha_by_path: Dict[str, str] = {}
+        # True si une lecture a échoué (quota, 5xx, timeout…): résultat partiel, à ne pas mettre en cache
+        self.degraded = False
+        # ne dépend que des métadonnées du repo: calculé une fois pour tous les idx.add
+        self._rfpf = self.recency_factor() * self.popularity_factor()
+
+    def cache_key(self) -> Optional[str]:
+        # Résultat réutilisable tant que le repo n'a pas reçu de push et que ses facteurs n'ont pas bougé
+        pushed = self.meta.get("pushed_at")
+        if not pushed:
+            return None
+        return f"{pushed}|{self._rfpf:.6f}|{analysis_fingerprint()}"
 
     def recency_factor(self) -> float:
         pushed = self.meta.get("pushed_at")
         if not pushed:
             return 1.0
         dt = datetime.datetime.fromisoformat(pushed.replace("Z","+00:00"))
-        days = (utcnow() - dt).days
+        days = (utcnow_ns() / 1e9 - dt.timestamp()) // 86400
         if days <= 30:
             return 1.5
         if days <= 180:
@@ -40,16 +116,12 @@ class RepoAnalyzer:
     def analyze(self) -> SkillIndex:
         idx = SkillIndex()
 
-        # 1) Languages (min fraction & lighter slope)
-        for lang, basew in self._languages_hint():
-            idx.add(lang, self.repo, basew*self.recency_factor()*self.popularity_factor(), "Languages (GitHub)")
-
-        # 2) Tree (fallback refs)
+        # 1) Tree (fallback refs)
         refs_to_try = [self.default_branch, "main", "master", "HEAD"]
         tree, last_err = None, None
         for ref in refs_to_try:
             try:
-                tree = self.gh.repo_tree(self.owner, self.repo, ref)
+                tree = self.gh.repo_tree(self.owner, self.repo, ref, pushed_at=self.meta.get("pushed_at"))
                 self.default_branch = ref
                 break
             except Exception as e:
@@ -57,36 +129,82 @@ class RepoAnalyzer:
         if tree is None:
             raise last_err
 
-        paths = [t["path"] for t in tree.get("tree", []) if t.get("type") == "blob"]
-        paths = [p for p in paths if not is_excluded(p)]
+        excluded = path_excluder()
+        blobs = [t for t in tree.get("tree", []) if t.get("type") == "blob" and not excluded(t["path"])]
+        paths = [t["path"] for t in blobs]
+        self.sha_by_path = {t["path"]: t["sha"] for t in blobs if t.get("sha")}
+
+        # Noms de fichiers calculés une fois ; manifest le moins profond retenu par nom.
+        # Même passe: candidats K8s filtrés par chemin puis par taille (arbre)
+        names = set()
+        path_by_name: Dict[str, str] = {}
+        req_paths: List[str] = []
+        k8s_paths: List[str] = []
+        for t, p in zip(blobs, paths):
+            low = p.lower()
+            name = p.rsplit("/", 1)[-1]
+            names.add(name)
+            if name not in path_by_name or p.count("/") < path_by_name[name].count("/"):
+                path_by_name[name] = p
+            name_low = low.rsplit("/", 1)[-1]
+            if name_low.startswith("requirements") and name_low.endswith(".txt"):
+                req_paths.append(p)
+            elif (len(k8s_paths) < K8S_MAX_MANIFESTS and name_low.endswith((".yaml", ".yml"))
+                  and _K8S_PATH_RE.search(low) and (t.get("size") or 0) <= K8S_MAX_BYTES):
+                k8s_paths.append(p)
 
-        # 2a) File hints
-        rfpf = self.recency_factor()*self.popularity_factor()
+        # 2) Fichiers à lire (manifests + candidats K8s, nombre borné), récupérés en un seul lot
+        wanted = [path_by_name[m] for m in ("package.json", "pyproject.toml", "pom.xml") if m in names]
+        wanted += req_paths + k8s_paths
+        # Listing GraphQL: langages et manifests racine déjà dans les métadonnées du repo
+        prefetched = self.meta.get("files") or {}
+        languages = self.meta.get("languages")
+        files = {p: prefetched[p] for p in wanted if p in prefetched}
+        # Contenu adressé par SHA: un manifest déjà lu (ici ou dans un autre repo) n'est pas re-téléchargé
+        for p in wanted:
+            sha = self.sha_by_path.get(p)
+            if p not in files and sha:
+                text = self.gh.cached_blob(sha)
+                if text is not None:
+                    files[p] = text
+        missing = [p for p in wanted if p not in files]
+        if missing or languages is None:
+            fetched_langs, fetched = self._fetch_snapshot(missing)
+            files.update(fetched)
+            for p, text in fetched.items():
+                if text is not None and p in self.sha_by_path:
+                    self.gh.store_blob(self.sha_by_path[p], text)
+            if languages is None:
+                languages = fetched_langs
+
+        rfpf = self._rfpf
+        # 3) Languages (min fraction & lighter slope)
+        for lang, basew in self._languages_hint(languages):
+            idx.add(lang, self.repo, basew*rfpf, "Languages (GitHub)")
+
+        # 4a) File hints
         for p in paths:
-            for pat, skill, w in SkillRules.FILE_HINTS:
-                if w <= 0:
-                    continue
-                if re.search(pat, p, flags=re.IGNORECASE):
-                    idx.add(skill, self.repo, w*rfpf, f"File hint: {p}")
-
-        # 2b) Dependencies
-        # package.json (root only, JS map only)
-        if "package.json" in {pathlib.PurePosixPath(p).name for p in paths}:
-            content = self.gh.get_file(self.owner, self.repo, "package.json", self.default_branch)
+            for skill, w in match_file_hints(p):
+                idx.add(skill, self.repo, w*rfpf, f"File hint: {p}")
+
+        # 4b) Dependencies
+        # package.json (le moins profond, JS map only)
+        if "package.json" in names:
+            content = files.get(path_by_name["package.json"])
             if content:
                 try:
-                    pkg = json.loads(content)
+                    # sans aucune section de dépendances, inutile de parser (seul tsconfig.json compte)
+                    pkg = parse_json(content) if any(f'"{k}"' in content for k in _JS_DEP_SECTIONS) else {}
                     deps = {}
-                    for k in ("dependencies","devDependencies","peerDependencies"):
+                    for k in _JS_DEP_SECTIONS:
                         d = pkg.get(k, {})
                         if isinstance(d, dict):
                             deps.update(d)
                     dep_keys = {str(k).lower() for k in deps.keys()}
-                    for dep in dep_keys:
-                        skill = SkillRules.JS_DEP_TO_SKILL.get(dep)
-                        if skill:
-                            idx.add(skill, self.repo, 1.8*rfpf, f"package.json dep: {dep}")
-                    if "typescript" in dep_keys or ("tsconfig.json" in {pathlib.PurePosixPath(p).name for p in paths}):
+                    # intersection en C puis tri: seules les deps connues sont visitées, dans un ordre stable
+                    for dep in sorted(dep_keys & JS_DEP_KEYS):
+                        idx.add(JS_DEP_LOOKUP[dep], self.repo, 1.8*rfpf, f"package.json dep: {dep}")
+                    if "typescript" in dep_keys or ("tsconfig.json" in names):
                         idx.add("TypeScript", self.repo, 0.9*rfpf, "TypeScript config/deps")
                     if "@angular/core" in dep_keys:
                         idx.add("Angular", self.repo, 1.3*rfpf, "Angular deps")
@@ -94,11 +212,12 @@ class RepoAnalyzer:
                     pass
 
         # pyproject.toml (Python map only)
-        if any(pathlib.PurePosixPath(p).name == "pyproject.toml" for p in paths):
-            content = self.gh.get_file(self.owner, self.repo, "pyproject.toml", self.default_branch)
-            if content:
+        if "pyproject.toml" in names:
+            content = files.get(path_by_name["pyproject.toml"])
+            # parse TOML seulement si une section lue plus bas est présente dans le texte
+            if content and ("[project" in content or "[tool.poetry" in content):
                 try:
-                    data = tomllib.loads(content)
+                    data = parse_toml(content)
                     deps: List[str] = []
                     for sec in ("project","tool.poetry"):
                         d = data
@@ -115,66 +234,97 @@ class RepoAnalyzer:
                                 gd = g.get("dependencies", {})
                                 if isinstance(gd, dict):
                                     deps += list(gd.keys())
-                    deps_lower = [re.split(r"[<>=\[\](),]| ", str(x))[0].lower() for x in deps]
-                    for dep in deps_lower:
-                        skill = SkillRules.PY_DEP_TO_SKILL.get(dep)
-                        if skill:
-                            idx.add(skill, self.repo, 1.8*rfpf, f"pyproject dep: {dep}")
+                    deps_lower = {_REQ_SPLIT.split(str(x), 1)[0].lower() for x in deps}
+                    for dep in sorted(deps_lower & PY_DEP_KEYS):
+                        idx.add(PY_DEP_LOOKUP[dep], self.repo, 1.8*rfpf, f"pyproject dep: {dep}")
                 except Exception:
                     pass
 
-        # requirements*.txt (Python map only)
-        req_paths = [p for p in paths if pathlib.PurePosixPath(p).name.lower().startswith("requirements") and p.lower().endswith(".txt")]
+        # requirements*.txt (Python map only) : paquets de tous les fichiers réunis, puis une intersection
+        req_pkgs = set()
         for rp in req_paths:
-            content = self.gh.get_file(self.owner, self.repo, rp, self.default_branch)
+            content = files.get(rp)
             if content:
                 for line in content.splitlines():
-                    pkg = re.split(r"[<>=\[\](),]| ", line.strip())[0].lower()
-                    if not pkg or pkg.startswith("#"):
+                    line = line.strip()
+                    # lignes vides, commentaires et options pip (-r, -e, --index-url) écartées avant tout split
+                    if not line or line[0] in "#-":
                         continue
-                    skill = SkillRules.PY_DEP_TO_SKILL.get(pkg)
-                    if skill:
-                        idx.add(skill, self.repo, 1.6*rfpf, f"requirements: {pkg}")
+                    req_pkgs.add(_REQ_SPLIT.split(line, 1)[0].lower())
+        for pkg in sorted(req_pkgs & PY_DEP_KEYS):
+            idx.add(PY_DEP_LOOKUP[pkg], self.repo, 1.6*rfpf, f"requirements: {pkg}")
 
         # Go / Rust / Java hints
-        if any(pathlib.PurePosixPath(p).name=="go.mod" for p in paths):
+        if "go.mod" in names:
             idx.add("Go", self.repo, 1.0*rfpf, "go.mod present")
-        if any(pathlib.PurePosixPath(p).name=="Cargo.toml" for p in paths):
+        if "Cargo.toml" in names:
             idx.add("Rust", self.repo, 1.0*rfpf, "Cargo.toml present")
-        if any(pathlib.PurePosixPath(p).name=="pom.xml" for p in paths):
+        if "pom.xml" in names:
             idx.add("Java", self.repo, 1.0*rfpf, "pom.xml present")
-            content = self.gh.get_file(self.owner, self.repo, "pom.xml", self.default_branch)
+            content = files.get(path_by_name["pom.xml"])
             if content:
                 try:
-                    root = ET.fromstring(content)
-                    for dep in root.findall(".//{*}dependency/{*}artifactId"):
-                        name = (dep.text or "").lower()
-                        if "spring-boot" in name:
-                            idx.add("Spring Boot", self.repo, 1.2*rfpf, "pom.xml dep spring-boot")
+                    if pom_uses_spring_boot(content):
+                        idx.add("Spring Boot", self.repo, 1.2*rfpf, "pom.xml dep spring-boot")
                 except Exception:
                     pass
-        if any(pathlib.PurePosixPath(p).name in ("build.gradle","build.gradle.kts") for p in paths):
+        if "build.gradle" in names or "build.gradle.kts" in names:
             idx.add("Java", self.repo, 0.8*rfpf, "Gradle present")
 
         # K8s heuristique
-        for p in paths:
-            if p.lower().endswith((".yaml",".yml")) and any(seg in p.lower() for seg in ("k8s/","manifests/","deploy","charts/","helm/")):
-                content = self.gh.get_file(self.owner, self.repo, p, self.default_branch)
-                if content and re.search(r"\bapiVersion:\s", content) and re.search(r"\bkind:\s", content):
-                    idx.add("Kubernetes", self.repo, 0.8*rfpf, f"K8s manifest: {p}")
+        for p in k8s_paths:
+            content = files.get(p)
+            if content and looks_like_k8s(content):
+                idx.add("Kubernetes", self.repo, 0.8*rfpf, f"K8s manifest: {p}")
 
         return idx
 
-    def _languages_hint(self) -> List[Tuple[str,float]]:
-        url = f"{GitHubHTTP.api}/repos/{self.owner}/{self.repo}/languages"
+    def _fetch_snapshot(self, paths: List[str]) -> Tuple[Optional[Dict[str, int]], Dict[str, Optional[str]]]:
+        # GraphQL: langages + contenus en 1 requête ; sinon retour aux appels REST unitaires
         try:
-            data = self.gh._req(url)
+            snap = self.gh.repo_snapshot(self.owner, self.repo, self.default_branch, paths)
+            return snap["languages"], snap["files"]
         except RuntimeError:
-            return []
+            pass
+        # Beaucoup de fichiers: une archive en flux plutôt qu'un appel Contents par fichier
+        if len(paths) > TARBALL_MIN_FILES:
+            try:
+                wanted = set(paths)
+                files: Dict[str, Optional[str]] = dict.fromkeys(paths)
+                files.update(self.gh.iter_tarball(self.owner, self.repo, self.default_branch, wanted.__contains__))
+                return None, files
+            except (RuntimeError, OSError, tarfile.TarError):
+                pass
+        # Petits lots: fichiers lus en parallèle (bornés ; le plafond par hôte de GitHubHTTP s'applique)
+        if len(paths) < 2:
+            files = {p: self._fetch_file(p) for p in paths}
+        else:
+            with ThreadPoolExecutor(max_workers=min(FILE_FETCH_WORKERS, len(paths))) as ex:
+                files = dict(zip(paths, ex.map(self._fetch_file, paths)))
+        # chemins issus de l'arbre: None = lecture échouée (le texte est décodé avec errors="replace")
+        if any(text is None for text in files.values()):
+            self.degraded = True
+        return None, files
+
+    def _fetch_file(self, path: str) -> Optional[str]:
+        # SHA connu par l'arbre: /git/blobs (petite enveloppe) ; sinon CDN raw
+        sha = self.sha_by_path.get(path)
+        if sha:
+            return self.gh.get_blob(self.owner, self.repo, sha)
+        return self.gh.get_raw(self.owner, self.repo, path, self.default_branch)
+
+    def _languages_hint(self, data: Optional[Dict[str, int]] = None) -> List[Tuple[str,float]]:
+        if data is None:
+            url = f"{GitHubHTTP.api}/repos/{self.owner}/{self.repo}/languages"
+            try:
+                data = self.gh._req(url)
+            except RuntimeError:
+                self.degraded = True
+                return []
         total = sum(data.values()) or 1
         langs: List[Tuple[str,float]] = []
         for k,v in data.items():
-            mapped = SkillRules.map_language(k)
+            mapped = map_language(k)
             if not mapped:
                 continue
             frac = v/total
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import json, zlib, pathlib, sqlite3, threading, time
+from typing import List, NamedTuple, Optional, Tuple
+
+class CachedResponse(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: bytes
+
+class HTTPCache:
+    # Réponses GitHub persistées (url -> ETag/Last-Modified + corps) pour les requêtes conditionnelles,
+    # plus les 404 récents (cache négatif à durée de vie courte)
+    def __init__(self, path: pathlib.Path):
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, etag TEXT, body BLOB, stored_at REAL)"
+        )
+        # bases créées par une version antérieure: colonnes ajoutées à la volée
+        cols = {row[1] for row in self._db.execute("PRAGMA table_info(responses)")}
+        if "last_modified" not in cols:
+            self._db.execute("ALTER TABLE responses ADD COLUMN last_modified TEXT")
+        if "status" not in cols:
+            self._db.execute("ALTER TABLE responses ADD COLUMN status INTEGER NOT NULL DEFAULT 200")
+        self._db.commit()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, body FROM responses WHERE url = ? AND status = 200", (url,)
+            ).fetchone()
+        return CachedResponse(row[0], row[1], bytes(row[2])) if row else None
+
+    def put(self, url: str, etag: Optional[str], body: bytes, last_modified: Optional[str] = None):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, body, stored_at, status) "
+                "VALUES (?, ?, ?, ?, ?, 200)",
+                (url, etag, last_modified, sqlite3.Binary(body), time.time()),
+            )
+            self._db.commit()
+
+    def put_missing(self, url: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, body, stored_at, status) "
+                "VALUES (?, NULL, NULL, X'', ?, 404)",
+                (url, time.time()),
+            )
+            self._db.commit()
+
+    def is_missing(self, url: str, ttl: float) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT stored_at FROM responses WHERE url = ? AND status = 404", (url,)
+            ).fetchone()
+        return row is not None and time.time() - row[0] < ttl
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class RepoSkillCache:
+    # Évidences (skill, poids, raison) d'analyses précédentes, par repo, valides pour une clé donnée
+    # (pushed_at + facteurs + empreinte du code) ; stockées en JSON compressé, jamais en pickle
+    def __init__(self, path: pathlib.Path):
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS repo_skills ("
+            "owner TEXT, repo TEXT, key TEXT, evidence BLOB, stored_at REAL, PRIMARY KEY (owner, repo))"
+        )
+        self._db.commit()
+
+    def get(self, owner: str, repo: str, key: str) -> Optional[List[Tuple[str, float, str]]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT evidence FROM repo_skills WHERE owner = ? AND repo = ? AND key = ?", (owner, repo, key)
+            ).fetchone()
+        if row is None:
+            return None
+        return [tuple(e) for e in json.loads(zlib.decompress(row[0]))]
+
+    def put(self, owner: str, repo: str, key: str, evidence: List[Tuple[str, float, str]]):
+        blob = zlib.compress(json.dumps(evidence, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO repo_skills (owner, repo, key, evidence, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (owner, repo, key, sqlite3.Binary(blob), time.time()),
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
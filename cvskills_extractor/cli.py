@@ -1,5 +1,5 @@
 from __future__ import annotations
-import os, sys, argparse
+import os, sys, logging, argparse
 
 try:
     from dotenv import load_dotenv
@@ -7,10 +7,12 @@ except ImportError:
     load_dotenv = None
 
 from .miner import PortfolioMiner
-from .utils import compile_repo_patterns_from_env
+from .utils import dotenv_needed, get_exclude_repo_matcher
+
+log = logging.getLogger(__name__)
 
 def main(argv=None):
-    if load_dotenv is not None:
+    if load_dotenv is not None and dotenv_needed():
         load_dotenv()
 
     parser = argparse.ArgumentParser(description="Infère les compétences à partir de vos repos GitHub (Markdown + JSON).")
@@ -19,12 +21,12 @@ def main(argv=None):
     args = parser.parse_args(argv)
 
     if not args.username or not args.token:
-        print("Erreur: définir GITHUB_USERNAME et GITHUB_TOKEN (ou passer --username/--token).", file=sys.stderr)
-        print("Exemple .env:\nGITHUB_USERNAME=TonPseudo\nGITHUB_TOKEN=ghp_xxx", file=sys.stderr)
+        log.error("Erreur: définir GITHUB_USERNAME et GITHUB_TOKEN (ou passer --username/--token).")
+        log.error("Exemple .env:\nGITHUB_USERNAME=TonPseudo\nGITHUB_TOKEN=ghp_xxx")
         sys.exit(1)
 
-    exclude_repo_patterns = compile_repo_patterns_from_env("EXCLUDE_REPOS")
-    PortfolioMiner(args.username, args.token, exclude_repo_patterns).run()
+    exclude_repo_matcher = get_exclude_repo_matcher("EXCLUDE_REPOS")
+    PortfolioMiner(args.username, args.token, exclude_repo_matcher).run()
 
 if __name__ == "__main__":
     main()
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import pathlib
 
 # ---- Config pondération/langages -----------------------------------
 # Baisser l'impact "Languages (GitHub)" et ignorer les tout-petits %
@@ -6,6 +7,16 @@ LANG_MIN_FRACTION = 0.08           # Ignore languages under 8% of bytes
 LANG_BASE = 0.4                    # base weight for language signal
 LANG_SLOPE = 1.0                   # slope × fraction
 
+# ---- Heuristique Kubernetes ----------------------------------------
+# Le cap par (skill, repo) de SkillIndex plafonne l'apport K8s à ~7 manifests: au-delà, lire plus ne change rien
+K8S_MAX_MANIFESTS = 20             # candidats YAML lus au plus par repo
+K8S_MAX_BYTES = 256 * 1024         # ignore les YAML plus gros (dumps, charts vendored)
+K8S_SCAN_CHARS = 8192              # apiVersion/kind sont déclarés en tête de document
+
+# ---- Lecture des fichiers ------------------------------------------
+TARBALL_MIN_FILES = 10             # sans GraphQL, au-delà: archive .tar.gz en flux plutôt que N appels Contents
+FILE_FETCH_WORKERS = 4             # sinon, fichiers d'un repo lus en parallèle (par repo analysé)
+
 # ---- Exclusions répertoires & fichiers vendored --------------------
 EXCLUDE_DIRS = {
     # classiques
@@ -22,3 +33,21 @@ EXCLUDE_DIRS = {
 EXCLUDE_FILE_SUBSTR = {
     "mysql-connector", "bootstrap", "jquery", "three.min.js", "minified/", "min/",
 }
+
+# ---- Concurrence / quotas GitHub -----------------------------------
+MAX_WORKERS = 8                    # repos analysés en parallèle (I/O-bound)
+REQUESTS_PER_SECOND = 10.0         # débit max côté client (secondary rate limit)
+PAGE_WORKERS = 5                   # pages de /user/repos récupérées en parallèle
+MAX_CONNECTIONS_PER_HOST = 20      # requêtes HTTP simultanées max vers un même hôte
+RATE_LIMIT_LOW_REMAINING = 20      # sous ce quota restant, les requêtes sont étalées jusqu'au reset
+GRAPHQL_REPOS_PER_PAGE = 20        # repos par requête GraphQL de listing (coût en nœuds des blobs)
+GRAPHQL_PREFETCH_FILES = ("package.json", "pyproject.toml", "pom.xml", "requirements.txt")   # lus au listing
+
+# ---- Cache HTTP (ETag / If-None-Match) -----------------------------
+HTTP_CACHE_PATH = pathlib.Path.home() / ".cache" / "cvskills" / "http.db"
+HTTP_NEGATIVE_TTL = 3600.0         # un 404 mis en cache est resservi pendant 1 h
+# Évidences par repo, resservies tant que pushed_at, les facteurs et le code d'analyse sont inchangés
+REPO_CACHE_PATH = pathlib.Path.home() / ".cache" / "cvskills" / "repos.db"
+
+# ---- Variables d'environnement -------------------------------------
+DOTENV_KEYS = ("GITHUB_USERNAME", "GITHUB_TOKEN", "EXCLUDE_REPOS")   # lues dans .env si absentes de l'env
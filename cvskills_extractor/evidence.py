@@ -1,8 +1,9 @@
 from __future__ import annotations
+import sys
 from dataclasses import dataclass
 from typing import Dict, List, Set, Tuple
 
-@dataclass
+@dataclass(slots=True)
 class Evidence:
     skill: str
     repo: str
@@ -13,15 +14,21 @@ class SkillIndex:
     def __init__(self):
         self.evidence: Dict[str, List[Evidence]] = {}
         self._caps: Dict[tuple, float] = {}   # (skill, repo) -> cumulated weight
-        self._seen: Set[tuple] = set()        # (skill, repo, why) to dedup
+        self._seen: Set[int] = set()          # hash((skill, repo, why)) to dedup
+        self._scores: Dict[str, float] = {}   # skill -> score total (tenu à jour par add)
+        self._repos: Dict[str, Set[str]] = {} # skill -> repos distincts
         # cap spécifique Jupyter par repo
         self.per_skill_cap: Dict[str, float] = {"Jupyter": 2.0}
 
     def add(self, skill: str, repo: str, weight: float, why: str, cap: float = 5.0):
-        key = (skill, repo, why)
+        # 64-bit hash of the triple: ints are far smaller than 3-tuples to keep around;
+        # a collision would only drop one duplicate-looking evidence line
+        key = hash((skill, repo, why))
         if key in self._seen:
             return
         self._seen.add(key)
+        # skill/repo reviennent sur des milliers d'évidences: une seule copie de chaque chaîne
+        skill, repo = sys.intern(skill), sys.intern(repo)
 
         eff_cap = min(cap, self.per_skill_cap.get(skill, cap))
         cap_key = (skill, repo)
@@ -35,13 +42,19 @@ class SkillIndex:
 
         self._caps[cap_key] = current + w
         self.evidence.setdefault(skill, []).append(Evidence(skill, repo, w, why))
+        self._scores[skill] = self._scores.get(skill, 0.0) + w
+        self._repos.setdefault(skill, set()).add(repo)
 
     def aggregate(self) -> List[Tuple[str, float, int, List[str]]]:
+        # tri "décoré": clés (dont le nom en minuscules) calculées une fois par skill ;
+        # l'indice d'insertion départage les égalités comme le tri stable d'origine
+        decorated = [
+            (-self._scores[skill], -len(self._repos[skill]), skill.lower(), i, skill)
+            for i, skill in enumerate(self.evidence)
+        ]
+        decorated.sort()
         out: List[Tuple[str, float, int, List[str]]] = []
-        for skill, evids in self.evidence.items():
-            score = sum(e.weight for e in evids)
-            repos = len(set(e.repo for e in evids))
-            whys = [f"- {e.repo}: {e.why} (+{e.weight:.2f})" for e in evids]
-            out.append((skill, score, repos, whys))
-        out.sort(key=lambda x: (-x[1], -x[2], x[0].lower()))
+        for _, neg_repos, _, _, skill in decorated:
+            whys = [f"- {e.repo}: {e.why} (+{e.weight:.2f})" for e in self.evidence[skill]]
+            out.append((skill, self._scores[skill], -neg_repos, whys))
         return out
@@ -1,63 +1,433 @@
 from __future__ import annotations
-import json, base64, time, urllib.request, urllib.error, urllib.parse
-from typing import Any, Dict, List, Optional
+import io, re, gzip, json, base64, time, pathlib, sqlite3, tarfile, threading, http.client, urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .cache import CachedResponse, HTTPCache
+from .config import (
+    REQUESTS_PER_SECOND, PAGE_WORKERS, MAX_CONNECTIONS_PER_HOST, HTTP_CACHE_PATH, HTTP_NEGATIVE_TTL,
+    GRAPHQL_REPOS_PER_PAGE, GRAPHQL_PREFETCH_FILES, RATE_LIMIT_LOW_REMAINING,
+)
+
+def json_loads(raw: bytes) -> Any:
+    # orjson si installé (parse direct des octets), sinon json standard (accepte aussi les bytes)
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+_LINK_LAST = re.compile(r'<([^>]+)>;\s*rel="last"')
+
+def last_page(link: Optional[str]) -> Optional[int]:
+    # En-tête Link de pagination GitHub -> numéro de la dernière page
+    m = _LINK_LAST.search(link or "")
+    if not m:
+        return None
+    page = urllib.parse.parse_qs(urllib.parse.urlsplit(m.group(1)).query).get("page", [""])[0]
+    return int(page) if page.isdigit() else None
+
+class RateLimiter:
+    # Espace les requêtes de 1/rate secondes, partagé entre tous les threads
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def defer(self, delay: float):
+        # Espacement ajouté à l'horaire commun: cumulé entre threads, un créneau par réponse reçue
+        with self._lock:
+            self._next = max(self._next, time.monotonic()) + delay
+
+    def pause_until(self, delay: float):
+        # Aucune requête (tous threads confondus) avant now + delay ; non cumulatif
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + delay)
 
 class GitHubHTTP:
     api = "https://api.github.com"
+    graphql_url = "https://api.github.com/graphql"
+    raw_url = "https://raw.githubusercontent.com"
+    redirect_codes = (301, 302, 303, 307, 308)
+    cache: Optional[HTTPCache] = None
 
-    def __init__(self, username: str, token: str):
+    def __init__(self, username: str, token: str, cache_path: Optional[pathlib.Path] = HTTP_CACHE_PATH):
         self.username = username
         self.token = token
+        self.limiter = RateLimiter(REQUESTS_PER_SECOND)
+        self._local = threading.local()   # connexions keep-alive, une par (thread, hôte)
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._slots_lock = threading.Lock()
+        self.cache: Optional[HTTPCache] = None
+        if cache_path is not None:
+            try:
+                self.cache = HTTPCache(cache_path)
+            except (OSError, sqlite3.Error) as e:
+                print(f"[!] Cache HTTP indisponible ({e}) — désactivé.")
 
-    def _req(self, url: str) -> Any:
-        req = urllib.request.Request(url)
-        req.add_header("Accept", "application/vnd.github+json")
-        req.add_header("X-GitHub-Api-Version", "2022-11-28")
+    def _headers(self) -> Dict[str, str]:
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+            "User-Agent": "cvskills-extractor",
+            "Accept-Encoding": "gzip",
+        }
         if self.token:
             auth = f"{self.username}:{self.token}".encode()
-            req.add_header("Authorization", "Basic " + base64.b64encode(auth).decode())
-        try:
-            with urllib.request.urlopen(req, timeout=60) as r:
-                return json.loads(r.read().decode("utf-8"))
-        except urllib.error.HTTPError as e:
-            body = ""
+            headers["Authorization"] = "Basic " + base64.b64encode(auth).decode()
+        return headers
+
+    def _connection(self, host: str) -> http.client.HTTPSConnection:
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(host)
+        if conn is None:
+            conn = conns[host] = http.client.HTTPSConnection(host, timeout=60)
+        return conn
+
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        # Plafond de requêtes simultanées par hôte, quel que soit l'empilement de pools de threads
+        with self._slots_lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = self._slots[host] = threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+            return slot
+
+    def _send_once(self, method: str, url: str, body: Optional[bytes], headers: Dict[str, str]) -> Tuple[int, Any, bytes]:
+        parts = urllib.parse.urlsplit(url)
+        with self._host_slot(parts.netloc):
+            return self._exchange(parts, method, body, headers)
+
+    def _exchange(self, parts: urllib.parse.SplitResult, method: str, body: Optional[bytes], headers: Dict[str, str]) -> Tuple[int, Any, bytes]:
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        for attempt in range(2):
+            conn = self._connection(parts.netloc)
             try:
-                body = e.read().decode("utf-8", errors="replace")
-            except Exception:
-                pass
-            raise RuntimeError(f"HTTP {e.code} on {url} :: {body[:200]}")
+                conn.request(method, target, body=body, headers=headers)
+                resp = conn.getresponse()
+                # gzip décodé en flux: le corps compressé n'est jamais gardé en entier à côté du JSON
+                if resp.headers.get("Content-Encoding") == "gzip":
+                    with gzip.GzipFile(fileobj=resp) as gz:
+                        data = gz.read()
+                else:
+                    data = resp.read()
+                return resp.status, resp.headers, data
+            except (http.client.HTTPException, ConnectionError):
+                # connexion keep-alive fermée côté serveur: on la rouvre une fois
+                conn.close()
+                if attempt:
+                    raise
+
+    def _send(self, method: str, url: str, body: Optional[bytes], headers: Dict[str, str]) -> Tuple[int, Any, bytes]:
+        for _ in range(5):
+            status, resp_headers, data = self._send_once(method, url, body, headers)
+            location = resp_headers.get("Location")
+            if status not in self.redirect_codes or not location:
+                return status, resp_headers, data
+            target = urllib.parse.urljoin(url, location)
+            if urllib.parse.urlsplit(target).netloc != urllib.parse.urlsplit(url).netloc:
+                headers = {k: v for k, v in headers.items() if k != "Authorization"}
+            if status == 303:
+                method, body = "GET", None
+            url = target
+        raise RuntimeError(f"HTTP {status}: trop de redirections depuis {url}")
+
+    def _req(self, url: str, data: Optional[bytes] = None, store: bool = True) -> Any:
+        return self._req_raw(url, data, store)[0]
+
+    def _req_raw(self, url: str, data: Optional[bytes] = None, store: bool = True) -> Tuple[Any, Any]:
+        # JSON décodé + en-têtes de réponse (Link, quotas…) ; store=False: corps non conservé sous l'URL
+        # (l'appelant en garde sa propre copie), donc pas de requête conditionnelle non plus
+        headers = self._headers()
+        if data is not None:
+            headers["Content-Type"] = "application/json"
+        # GET uniquement: un 304 ne consomme pas de quota primaire
+        cached = self._conditional(url, headers) if data is None and store else None
+        if data is None and self.cache is not None and self.cache.is_missing(url, HTTP_NEGATIVE_TTL):
+            raise RuntimeError(f"HTTP 404 on {url} :: (cache)")
+        for attempt in range(2):
+            self.limiter.wait()
+            status, resp_headers, body = self._send("GET" if data is None else "POST", url, data, headers)
+            exhausted = self._honor_rate_limit(resp_headers)
+            if status == 304 and cached:
+                return json_loads(cached.body), resp_headers
+            retry_after = resp_headers.get("Retry-After")
+            if status in (403, 429) and attempt == 0 and (retry_after or exhausted):
+                # quota épuisé: la pause jusqu'au reset est déjà faite, on rejoue directement
+                if retry_after:
+                    delay = float(retry_after) if retry_after.isdigit() else 60.0
+                    print(f"[!] Limite GitHub atteinte — pause {delay:.0f}s puis nouvel essai.")
+                    time.sleep(delay)
+                continue
+            if status == 404 and data is None and self.cache is not None:
+                self.cache.put_missing(url)
+            if not 200 <= status < 300:
+                raise RuntimeError(f"HTTP {status} on {url} :: {body.decode('utf-8', errors='replace')[:200]}")
+            if data is None and store:
+                self._store(url, resp_headers, body)
+            return json_loads(body), resp_headers
+
+    def _conditional(self, url: str, headers: Dict[str, str]) -> Optional[CachedResponse]:
+        # Validateurs de la copie en cache -> en-têtes conditionnels (ETag prioritaire côté GitHub)
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        return cached
+
+    def _store(self, url: str, resp_headers: Any, body: bytes):
+        etag, last_modified = resp_headers.get("ETag"), resp_headers.get("Last-Modified")
+        if self.cache is not None and (etag or last_modified):
+            self.cache.put(url, etag, body, last_modified)
+
+    def _honor_rate_limit(self, headers) -> bool:
+        # Aucune pause tant que le quota est confortable ; sous RATE_LIMIT_LOW_REMAINING, le reste du quota
+        # est réparti jusqu'au reset sur l'horaire partagé du RateLimiter (un seul rythme pour tous les
+        # threads) ; à 0, plus aucune requête avant le reset.
+        # True si le quota était épuisé (la requête peut alors être rejouée)
+        remaining = headers.get("X-RateLimit-Remaining", "") if headers is not None else ""
+        if not remaining.isdigit() or int(remaining) >= RATE_LIMIT_LOW_REMAINING:
+            return False
+        reset = headers.get("X-RateLimit-Reset", "")
+        delay = int(reset) - time.time() if reset.isdigit() else 0
+        if remaining == "0":
+            if delay > 0:
+                print(f"[!] Quota GitHub épuisé — pause {delay:.0f}s jusqu'au reset.")
+                self.limiter.pause_until(delay)
+            return True
+        if delay > 0:
+            self.limiter.defer(delay / int(remaining))
+        return False
+
+    def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        payload = json.dumps({"query": query, "variables": variables or {}}).encode("utf-8")
+        res = self._req(self.graphql_url, payload)
+        if not isinstance(res, dict) or not isinstance(res.get("data"), dict):
+            errors = res.get("errors") if isinstance(res, dict) else res
+            raise RuntimeError(f"GraphQL error on {self.graphql_url} :: {str(errors)[:200]}")
+        return res["data"]
+
+    def repo_snapshot(self, owner: str, repo: str, ref: str, paths: List[str]) -> Dict[str, Any]:
+        # Un seul aller-retour: langages + texte de chaque fichier demandé (alias f0, f1, …)
+        decls = ["$owner: String!", "$name: String!"]
+        fields = ["languages(first: 100) { edges { size node { name } } }"]
+        variables: Dict[str, Any] = {"owner": owner, "name": repo}
+        for i, path in enumerate(paths):
+            decls.append(f"$e{i}: String!")
+            fields.append(f"f{i}: object(expression: $e{i}) {{ ... on Blob {{ text }} }}")
+            variables[f"e{i}"] = f"{ref}:{path}"
+        query = (
+            f"query({', '.join(decls)}) {{ repository(owner: $owner, name: $name) {{ "
+            + " ".join(fields) + " } }"
+        )
+        node = self.graphql(query, variables).get("repository")
+        if not isinstance(node, dict):
+            raise RuntimeError(f"GraphQL: repository {owner}/{repo} introuvable")
+        edges = (node.get("languages") or {}).get("edges") or []
+        return {
+            "languages": {e["node"]["name"]: e["size"] for e in edges},
+            "files": {path: (node.get(f"f{i}") or {}).get("text") for i, path in enumerate(paths)},
+        }
 
     def list_repos(self, per_page=100, include_private=True) -> List[Dict[str, Any]]:
-        repos, page = [], 1
+        # GraphQL d'abord (métadonnées + langages + manifests racine par lot) ; REST sinon
+        try:
+            return self.list_repos_graphql(include_private)
+        except RuntimeError:
+            return self._list_repos_rest(per_page, include_private)
+
+    def list_repos_graphql(self, include_private=True) -> List[Dict[str, Any]]:
+        # Mêmes clés que l'API REST, plus "languages" et "files" (manifests racine préchargés)
+        blobs = " ".join(
+            f'm{i}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text }} }}'
+            for i, path in enumerate(GRAPHQL_PREFETCH_FILES)
+        )
+        if include_private:
+            decls, variables = "$cursor: String", {}
+            owner = "viewer { repositories(first: %d, after: $cursor, ownerAffiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER])"
+        else:
+            # toute variable déclarée doit être utilisée: $login seulement ici
+            decls, variables = "$cursor: String, $login: String!", {"login": self.username}
+            owner = "user(login: $login) { repositories(first: %d, after: $cursor, ownerAffiliations: [OWNER], privacy: PUBLIC)"
+        query = (
+            f"query({decls}) {{ " + owner % GRAPHQL_REPOS_PER_PAGE + " { pageInfo { hasNextPage endCursor } nodes { "
+            "name owner { login } isFork isArchived stargazerCount forkCount pushedAt defaultBranchRef { name } "
+            "languages(first: 100) { edges { size node { name } } } " + blobs + " } } } }"
+        )
+        repos: List[Dict[str, Any]] = []
+        cursor = None
+        while True:
+            data = self.graphql(query, {**variables, "cursor": cursor})
+            conn = (data.get("viewer" if include_private else "user") or {}).get("repositories")
+            if not isinstance(conn, dict):
+                raise RuntimeError("GraphQL: liste des repositories indisponible")
+            for node in conn.get("nodes") or []:
+                if not isinstance(node, dict):   # repo inaccessible (ex. org SAML): ignoré
+                    continue
+                repos.append({
+                    "name": node["name"],
+                    "owner": {"login": node["owner"]["login"]},
+                    "fork": node["isFork"],
+                    "archived": node["isArchived"],
+                    "default_branch": (node.get("defaultBranchRef") or {}).get("name") or "main",
+                    "stargazers_count": node["stargazerCount"],
+                    "forks_count": node["forkCount"],
+                    "pushed_at": node["pushedAt"],
+                    "languages": {e["node"]["name"]: e["size"] for e in (node.get("languages") or {}).get("edges") or []},
+                    "files": {path: (node.get(f"m{i}") or {}).get("text") for i, path in enumerate(GRAPHQL_PREFETCH_FILES)},
+                })
+            info = conn.get("pageInfo") or {}
+            if not info.get("hasNextPage"):
+                return repos
+            cursor = info.get("endCursor")
+
+    def _list_repos_rest(self, per_page=100, include_private=True) -> List[Dict[str, Any]]:
         endpoint = (
             f"/user/repos?per_page={per_page}&page="
             if include_private
             else f"/users/{self.username}/repos?per_page={per_page}&page="
         )
+        try:
+            repos, headers = self._req_raw(self.api + endpoint + "1")
+        except RuntimeError as e:
+            if include_private and ("HTTP 401" in str(e) or "HTTP 403" in str(e)):
+                print("[!] Token insuffisant pour /user/repos — fallback public.")
+                return self._list_repos_rest(per_page, include_private=False)
+            raise
+        repos = list(repos or [])
+        if len(repos) < per_page:
+            return repos
+        last = last_page(headers.get("Link"))
+        if last:
+            # nombre de pages connu: pages 2..N en parallèle, concaténées dans l'ordre
+            urls = [self.api + endpoint + str(page) for page in range(2, last + 1)]
+            with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as ex:
+                for batch in ex.map(self._req, urls):
+                    repos.extend(batch or [])
+            return repos
+        page = 2
         while True:
-            url = self.api + endpoint + str(page)
-            try:
-                batch = self._req(url)
-            except RuntimeError as e:
-                if include_private and ("HTTP 401" in str(e) or "HTTP 403" in str(e)):
-                    print("[!] Token insuffisant pour /user/repos — fallback public.")
-                    include_private = False
-                    endpoint = f"/users/{self.username}/repos?per_page={per_page}&page="
-                    page, repos = 1, []
-                    continue
-                raise
+            batch = self._req(self.api + endpoint + str(page))
             if not batch:
                 break
             repos.extend(batch)
             if len(batch) < per_page:
                 break
             page += 1
-            time.sleep(0.10)
         return repos
 
-    def repo_tree(self, owner: str, repo: str, ref: str):
+    def repo_tree(self, owner: str, repo: str, ref: str, pushed_at: Optional[str] = None):
         url = f"{self.api}/repos/{owner}/{repo}/git/trees/{urllib.parse.quote(ref)}?recursive=1"
-        return self._req(url)
+        if pushed_at is None or self.cache is None:
+            return self._req(url)
+        # Arbre inchangé tant que le repo n'a pas reçu de push: servi sans aucun aller-retour
+        key = f"{url}#pushed_at={pushed_at}"
+        hit = self.cache.get(key)
+        if hit:
+            return json_loads(hit.body)
+        # arbre complet (plusieurs Mo sur un monorepo) non conservé: seule la copie allégée ci-dessous l'est
+        tree = self._req(url, store=False)
+        # seuls les blobs (path/sha/size) servent à l'analyse: l'entrée mise en cache est allégée d'autant
+        slim = {"tree": [{"path": t["path"], "type": "blob", "sha": t.get("sha"), "size": t.get("size")}
+                         for t in tree.get("tree", []) if t.get("type") == "blob"]}
+        self.cache.put(key, None, json.dumps(slim, separators=(",", ":")).encode("utf-8"))
+        return slim
+
+    def iter_tarball(self, owner: str, repo: str, ref: str, wanted: Callable[[str], bool]) -> Iterator[Tuple[str, str]]:
+        # Archive .tar.gz du repo lue en flux: seuls les fichiers retenus par `wanted` sont décodés
+        url = f"{self.api}/repos/{owner}/{repo}/tarball/{urllib.parse.quote(ref)}"
+        headers = {k: v for k, v in self._headers().items() if k != "Accept-Encoding"}
+        self.limiter.wait()
+        status, resp_headers, data = self._send_once("GET", url, None, headers)
+        if status in self.redirect_codes and resp_headers.get("Location"):
+            target = urllib.parse.urljoin(url, resp_headers["Location"])
+            if urllib.parse.urlsplit(target).netloc != urllib.parse.urlsplit(url).netloc:
+                headers.pop("Authorization", None)   # codeload: URL déjà signée
+            conn, stream = self._stream(target, headers)
+        elif status == 200:
+            conn, stream = None, io.BytesIO(data)
+        else:
+            raise RuntimeError(f"HTTP {status} on {url} :: {data.decode('utf-8', errors='replace')[:200]}")
+        try:
+            with tarfile.open(fileobj=stream, mode="r|gz") as tar:
+                for member in tar:
+                    if not member.isfile():
+                        continue
+                    path = member.name.split("/", 1)[-1]   # retire le dossier racine owner-repo-sha/
+                    if wanted(path):
+                        f = tar.extractfile(member)
+                        if f is not None:
+                            yield path, f.read().decode("utf-8", errors="replace")
+        finally:
+            stream.close()
+            if conn is not None:
+                conn.close()
+
+    def _stream(self, url: str, headers: Dict[str, str]) -> Tuple[http.client.HTTPSConnection, Any]:
+        # Connexion dédiée (hors pool keep-alive): le corps est consommé au fil de l'eau
+        parts = urllib.parse.urlsplit(url)
+        conn = http.client.HTTPSConnection(parts.netloc, timeout=60)
+        conn.request("GET", parts.path + (f"?{parts.query}" if parts.query else ""), headers=headers)
+        resp = conn.getresponse()
+        if resp.status != 200:
+            conn.close()
+            raise RuntimeError(f"HTTP {resp.status} on {url}")
+        return conn, resp
+
+    def get_raw(self, owner: str, repo: str, path: str, ref: str) -> Optional[str]:
+        # Octets bruts via le CDN raw (ni enveloppe JSON ni base64) ; 404 -> API Contents
+        url = f"{self.raw_url}/{owner}/{repo}/{urllib.parse.quote(ref)}/{urllib.parse.quote(path)}"
+        headers = self._headers()
+        headers["Accept"] = "*/*"
+        cached = self._conditional(url, headers)
+        self.limiter.wait()
+        try:
+            status, resp_headers, body = self._send("GET", url, None, headers)
+        except (RuntimeError, OSError, http.client.HTTPException):
+            return self.get_file(owner, repo, path, ref)
+        if status == 304 and cached:
+            body = cached.body
+        elif status == 404:
+            return self.get_file(owner, repo, path, ref)
+        elif not 200 <= status < 300:
+            return None
+        else:
+            self._store(url, resp_headers, body)
+        return body.decode("utf-8", errors="replace")
+
+    def cached_blob(self, sha: str) -> Optional[str]:
+        # Blobs adressés par contenu: une entrée ne périme jamais et sert tous les repos
+        hit = self.cache.get(f"blob:{sha}") if self.cache is not None else None
+        return hit.body.decode("utf-8", errors="replace") if hit else None
+
+    def store_blob(self, sha: str, text: str):
+        if self.cache is not None:
+            self.cache.put(f"blob:{sha}", None, text.encode("utf-8"))
+
+    def get_blob(self, owner: str, repo: str, sha: str) -> Optional[str]:
+        # /git/blobs: enveloppe minimale (sha, size, content) comparée à /contents
+        text = self.cached_blob(sha)
+        if text is not None:
+            return text
+        try:
+            data = self._req(f"{self.api}/repos/{owner}/{repo}/git/blobs/{sha}")
+            text = base64.b64decode(data["content"]).decode("utf-8", errors="replace")
+        except (RuntimeError, KeyError, TypeError, ValueError):
+            return None
+        self.store_blob(sha, text)
+        return text
 
     def get_file(self, owner: str, repo: str, path: str, ref: str) -> Optional[str]:
         url = f"{self.api}/repos/{owner}/{repo}/contents/{urllib.parse.quote(path)}?ref={urllib.parse.quote(ref)}"
@@ -0,0 +1,126 @@
+from __future__ import annotations
+import re, threading, functools
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+from .rules_data import get_compiled_file_hints
+
+def _expand_literal(body: str) -> Optional[List[str]]:
+    # Motif sans métacaractère hormis \. , x? et (a|b) -> liste finie de chaînes ; None sinon
+    out = [""]
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == "\\" and i + 1 < len(body) and body[i+1] in ".-_":
+            alts, i = [body[i+1]], i + 2
+        elif c == "(":
+            j = body.find(")", i)
+            if j < 0 or "(" in body[i+1:j]:
+                return None
+            alts = []
+            for alt in body[i+1:j].split("|"):
+                sub = _expand_literal(alt)
+                if sub is None:
+                    return None
+                alts.extend(sub)
+            i = j + 1
+        elif c.isalnum() or c in "_-":
+            alts, i = [c], i + 1
+        else:
+            return None
+        if i < len(body) and body[i] == "?":
+            alts, i = alts + [""], i + 1
+        out = [o + a for o in out for a in alts]
+    return out
+
+class HintTables(NamedTuple):
+    compiled: List[Tuple[re.Pattern, str, float]]   # indices de poids non nul, ordre de FILE_HINTS
+    basenames: Dict[str, List[int]]                 # basename (minuscules) -> ids
+    suffixes: Dict[str, List[int]]                  # suffixe ".ext" (minuscules) -> ids
+    regex_ids: List[int]                            # ids restant à évaluer par regex
+    union: re.Pattern
+
+# Tables construites au premier usage (et non à l'import) puis réutilisées
+@functools.cache
+def get_hint_tables() -> HintTables:
+    compiled = [(pat, skill, w) for pat, skill, w in get_compiled_file_hints() if w > 0]
+    # Indices "nom de fichier exact" ((^|/)NOM$, la majorité): simple lookup du basename en minuscules
+    basenames: Dict[str, List[int]] = {}
+    suffixes: Dict[str, List[int]] = {}
+    regex_ids: List[int] = []
+    for i, (pat, _, _) in enumerate(compiled):
+        src = pat.pattern
+        names = _expand_literal(src[5:-1]) if src.startswith("(^|/)") and src.endswith("$") else None
+        # Indices "extension" (\.EXT$, ex. \.(tf|tfvars)$) : lookup des suffixes du basename à partir de chaque "."
+        exts = _expand_literal(src[:-1]) if src.startswith("\\.") and src.endswith("$") else None
+        if names:
+            for name in names:
+                basenames.setdefault(name.lower(), []).append(i)
+        elif exts:
+            for ext in exts:
+                suffixes.setdefault(ext.lower(), []).append(i)
+        else:
+            regex_ids.append(i)
+    # Union des motifs restants: un seul scan écarte les chemins sans aucun indice (la grande majorité).
+    # search() ne rapporte qu'une alternative par chemin, or un chemin peut porter plusieurs indices
+    # (ex. scripts/run.sh -> deux indices Shell) ; les motifs restants ne sont testés que sur ces chemins-là.
+    union = re.compile("|".join(f"(?P<g{i}>{compiled[i][0].pattern})" for i in regex_ids), re.IGNORECASE)
+    return HintTables(compiled, basenames, suffixes, regex_ids, union)
+
+@functools.cache
+def get_hyperscan_db():
+    # Hyperscan (optionnel): tous les motifs dans un seul automate, chaque id rapporté au plus une fois
+    if hyperscan is None:
+        return None
+    t = get_hint_tables()
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    try:
+        db.compile(
+            expressions=[t.compiled[i][0].pattern.encode("utf-8") for i in t.regex_ids],
+            ids=t.regex_ids,
+            elements=len(t.regex_ids),
+            flags=hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH,
+        )
+    except hyperscan.error:
+        return None
+    return db
+
+_hs_local = threading.local()   # le scratch Hyperscan n'est pas partageable entre threads
+
+def _on_hs_match(hint_id: int, start: int, end: int, flags: int, matched: Set[int]) -> Optional[bool]:
+    matched.add(hint_id)
+    return None
+
+def _match_hyperscan(path: str) -> Set[int]:
+    db = get_hyperscan_db()
+    # scratch lié à la base: réalloué si deux threads ont construit la base en concurrence
+    if getattr(_hs_local, "db", None) is not db:
+        _hs_local.scratch, _hs_local.db = hyperscan.Scratch(db), db
+    matched: Set[int] = set()
+    db.scan(path.encode("utf-8"), match_event_handler=_on_hs_match, context=matched, scratch=_hs_local.scratch)
+    return matched
+
+def _match_re(path: str) -> Set[int]:
+    t = get_hint_tables()
+    m = t.union.search(path)
+    if m is None:
+        return set()
+    first = int(m.lastgroup[1:])
+    return {i for i in t.regex_ids if i == first or t.compiled[i][0].search(path)}
+
+def match_file_hints(path: str) -> Iterator[Tuple[str, float]]:
+    t = get_hint_tables()
+    matched = _match_hyperscan(path) if get_hyperscan_db() is not None else _match_re(path)
+    name = path.rsplit("/", 1)[-1].lower()
+    matched.update(t.basenames.get(name, ()))
+    dot = name.find(".")
+    while dot >= 0:   # ".k8s.yaml" puis ".yaml" pour "app.k8s.yaml"
+        matched.update(t.suffixes.get(name[dot:], ()))
+        dot = name.find(".", dot + 1)
+    for i in sorted(matched):   # ordre de FILE_HINTS, quel que soit le moteur
+        _, skill, w = t.compiled[i]
+        yield skill, w
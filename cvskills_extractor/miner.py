@@ -1,20 +1,63 @@
 from __future__ import annotations
-import os, re, json, pathlib, datetime
-from typing import Any, Dict, List, Optional, Tuple
+import io, os, re, json, heapq, pathlib, sqlite3, datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .github_http import GitHubHTTP
 from .evidence import SkillIndex
-from .rules import SkillRules
+from .rules_data import CATEGORIES, SKILL_TO_CATEGORY
 from .analyzer import RepoAnalyzer
+from .cache import RepoSkillCache
+from .config import MAX_WORKERS, REPO_CACHE_PATH
 
 class PortfolioMiner:
-    def __init__(self, username: str, token: str, exclude_repo_patterns: Optional[List[re.Pattern]] = None):
+    max_workers = MAX_WORKERS
+    repo_cache: Optional[RepoSkillCache] = None
+
+    def __init__(self, username: str, token: str,
+                 exclude_repo_patterns: Optional[Union[re.Pattern, List[re.Pattern]]] = None):
         self.gh = GitHubHTTP(username, token)
         self.username = username
         self.exclude_repo_patterns = exclude_repo_patterns or []
+        try:
+            self.repo_cache = RepoSkillCache(REPO_CACHE_PATH)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[!] Cache des repos indisponible ({e}) — désactivé.")
 
     def _is_repo_excluded(self, name: str) -> bool:
-        return any(p.search(name) for p in self.exclude_repo_patterns)
+        # motif fusionné (get_exclude_repo_matcher) ou liste de motifs
+        pats = self.exclude_repo_patterns
+        if isinstance(pats, re.Pattern):
+            return pats.search(name) is not None
+        return any(p.search(name) for p in pats)
+
+    def _analyze_one(self, r: Dict[str, Any]) -> Optional[SkillIndex]:
+        name, owner = r["name"], r["owner"]["login"]
+        try:
+            ra = RepoAnalyzer(self.gh, owner, r)
+            key = ra.cache_key() if self.repo_cache is not None else None
+            cached = self.repo_cache.get(owner, name, key) if key else None
+            if cached is not None:
+                print(f"[+] {owner}/{name} (inchangé, cache)")
+                idx = SkillIndex()
+                for skill, w, why in cached:   # poids déjà plafonnés: ré-ajout à l'identique
+                    idx.add(skill, name, w, why)
+                return idx
+            print(f"[+] {owner}/{name}")
+            idx = ra.analyze()
+            if key and not ra.degraded:   # analyse partielle (lecture échouée): refaite au prochain run
+                self.repo_cache.put(owner, name, key, [
+                    (e.skill, e.weight, e.why) for evids in idx.evidence.values() for e in evids
+                ])
+            return idx
+        except Exception as ex:
+            print(f"    ! Erreur sur {owner}/{name}: {ex}")
+            return None
 
     def run(self) -> Dict[str, Any]:
         print(f"[*] Utilisateur GitHub: {self.username}")
@@ -31,16 +74,14 @@ class PortfolioMiner:
             return {"markdown": None, "json": None}
 
         global_idx = SkillIndex()
-        for r in repos:
-            name, owner = r["name"], r["owner"]["login"]
-            try:
-                print(f"[+] {owner}/{name}")
-                idx = RepoAnalyzer(self.gh, owner, r).analyze()
+        # Analyses en parallèle ; fusion mono-thread dans l'ordre des repos (sortie déterministe)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+            for idx in ex.map(self._analyze_one, repos):
+                if idx is None:
+                    continue
                 for skill, evids in idx.evidence.items():
                     for e in evids:
                         global_idx.add(e.skill, e.repo, e.weight, e.why)
-            except Exception as ex:
-                print(f"    ! Erreur sur {owner}/{name}: {ex}")
 
         aggregated = global_idx.aggregate()
         if not aggregated:
@@ -51,8 +92,13 @@ class PortfolioMiner:
         out_md, out_json = "cv_skills.md", "skills.json"
         with open(out_md, "w", encoding="utf-8") as f:
             f.write(doc)
-        with open(out_json, "w", encoding="utf-8") as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            # même rendu (UTF-8, indentation 2) que json.dump ci-dessous
+            with open(out_json, "wb") as f:
+                f.write(orjson.dumps(json_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(out_json, "w", encoding="utf-8") as f:
+                json.dump(json_data, f, ensure_ascii=False, indent=2)
         print(f"[*] Généré: {out_md} & {out_json}")
         return {"markdown": out_md, "json": out_json}
 
@@ -67,32 +113,35 @@ class PortfolioMiner:
 
     def _to_cv_markdown(self, agg: List[Tuple[str, float, int, List[str]]]) -> str:
         # 1) résumé par catégories
-        by_cat: Dict[str, List[Tuple[str,float]]] = {c:[] for c in SkillRules.CATEGORIES.keys()}
+        by_cat: Dict[str, List[Tuple[str,float]]] = {c:[] for c in CATEGORIES.keys()}
         others: List[Tuple[str,float]] = []
         for s, sc, r, _ in agg:
-            placed = False
-            for cat, items in SkillRules.CATEGORIES.items():
-                if s in items:
-                    by_cat[cat].append((s, sc)); placed = True; break
-            if not placed:
+            cat = SKILL_TO_CATEGORY.get(s)
+            if cat is not None:
+                by_cat[cat].append((s, sc))
+            else:
                 others.append((s, sc))
 
         def topn(lst, n=12):
-            lst.sort(key=lambda x: -x[1]); return [name for name,_ in lst[:n]]
+            # sélection partielle O(K log n) ; même ordre (stable) que le tri complet tronqué
+            return [name for name,_ in heapq.nlargest(n, lst, key=lambda x: x[1])]
 
-        lines = ["## Compétences démontrées par mes repositories"]
-        for cat in SkillRules.CATEGORIES.keys():
+        buf = io.StringIO()
+        w = buf.write
+        w("## Compétences démontrées par mes repositories")
+        for cat in CATEGORIES.keys():
             items = topn(by_cat[cat], n=12)
             if items:
-                lines.append(f"**{cat}** : " + ", ".join(items))
+                w(f"\n**{cat}** : "); w(", ".join(items))
         if others:
             items = topn(others, n=20)
-            lines.append("**Autres** : " + ", ".join(items))
+            w("\n**Autres** : "); w(", ".join(items))
 
         # 2) PREUVES COMPLÈTES — toutes les lignes, sans troncage
-        lines.append("\n<details open><summary><strong>Preuves complètes (toutes)</strong></summary>\n")
+        w("\n\n<details open><summary><strong>Preuves complètes (toutes)</strong></summary>\n")
         for s, sc, r, whys in agg:
-            lines.append(f"\n### {s}  \nScore total: {sc:.2f} • Repos distincts: {r}")
-            lines.extend(whys)
-        lines.append("\n</details>\n")
-        return "\n".join(lines)
+            w("\n\n### "); w(s); w("  \nScore total: "); w(format(sc, ".2f")); w(" • Repos distincts: "); w(str(r))
+            if whys:   # lignes déjà formatées par SkillIndex.aggregate
+                w("\n"); w("\n".join(whys))
+        w("\n\n</details>\n")
+        return buf.getvalue()
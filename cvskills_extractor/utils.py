@@ -1,18 +1,36 @@
 from __future__ import annotations
-import os, sys, re, pathlib, datetime
-from typing import List
+import os, re, time, logging, datetime, functools
+from typing import Callable, Dict, List, Optional, Union
 
-from .config import EXCLUDE_DIRS, EXCLUDE_FILE_SUBSTR
+from .config import EXCLUDE_DIRS, EXCLUDE_FILE_SUBSTR, DOTENV_KEYS
+
+log = logging.getLogger(__name__)
+
+_EXCLUDE_DIRS_LOWER = frozenset(d.lower() for d in EXCLUDE_DIRS)
+# Toutes les sous-chaînes exclues en une seule alternation (comparée au chemin en minuscules)
+_EXCLUDE_SUBSTR_RE = re.compile("|".join(map(re.escape, sorted(EXCLUDE_FILE_SUBSTR))))
 
 def is_excluded(path: str) -> bool:
-    p = pathlib.PurePosixPath(path)
-    for part in p.parts:
-        if part in ("", "/"):
-            continue
-        if part.lower() in EXCLUDE_DIRS:
-            return True
-    low = str(p.as_posix()).lower()
-    return any(s in low for s in EXCLUDE_FILE_SUBSTR)
+    low = path.lower()
+    if not _EXCLUDE_DIRS_LOWER.isdisjoint(low.split("/")):
+        return True
+    return _EXCLUDE_SUBSTR_RE.search(low) is not None
+
+def is_excluded_dir(name: str) -> bool:
+    return name.lower() in _EXCLUDE_DIRS_LOWER
+
+def path_excluder() -> Callable[[str], bool]:
+    # Même verdict que is_excluded, mémorisé par dossier: les milliers d'entrées d'un
+    # node_modules/ ou dist/ ne coûtent qu'un test de basename chacune
+    dirs: Dict[str, bool] = {}
+
+    def excluded(path: str) -> bool:
+        d, _, base = path.rpartition("/")
+        ex = dirs.get(d)
+        if ex is None:
+            ex = dirs[d] = bool(d) and is_excluded(d + "/")
+        return ex or is_excluded_dir(base) or _EXCLUDE_SUBSTR_RE.search(base.lower()) is not None
+    return excluded
 
 def compile_repo_patterns_from_env(env_var: str = "EXCLUDE_REPOS") -> List[re.Pattern]:
     raw = os.getenv(env_var, "").strip()
@@ -24,8 +42,50 @@ def compile_repo_patterns_from_env(env_var: str = "EXCLUDE_REPOS") -> List[re.Pa
         try:
             compiled.append(re.compile(p, flags=re.IGNORECASE))
         except re.error as e:
-            print(f"[!] Regex invalide dans {env_var}: {p} ({e}) — ignoré.", file=sys.stderr)
+            log.warning("[!] Regex invalide dans %s: %s (%s) — ignoré.", env_var, p, e)
     return compiled
 
+def dotenv_needed() -> bool:
+    # load_dotenv ne remplace jamais une variable déjà définie: .env n'apporte rien si toutes sont là
+    return not all(k in os.environ for k in DOTENV_KEYS)
+
+# Références à des groupes (\1, (?P=nom), (?(1)…)) : leur numérotation change une fois les motifs joints
+_GROUP_REF_RE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+@functools.lru_cache(maxsize=None)
+def get_exclude_repo_matcher(env_var: str = "EXCLUDE_REPOS") -> Optional[Union[re.Pattern, List[re.Pattern]]]:
+    # Motifs combinables en une seule alternation (un seul search() par repo) ; les autres (groupes nommés,
+    # références arrière, drapeaux globaux (?i)…) restent à part: liste [union, *autres] ; None si rien à exclure
+    fused: List[str] = []
+    kept: List[re.Pattern] = []
+    patterns = compile_repo_patterns_from_env(env_var)
+    for p in patterns:
+        if p.groupindex or _GROUP_REF_RE.search(p.pattern):
+            kept.append(p)
+            continue
+        try:
+            re.compile(f"(?:{p.pattern})")
+        except re.error:
+            kept.append(p)
+            continue
+        fused.append(f"(?:{p.pattern})")
+    if fused:
+        try:
+            union = re.compile("|".join(fused), flags=re.IGNORECASE)
+        except re.error as e:
+            log.warning("[!] Motifs de %s non combinables (%s) — testés un par un.", env_var, e)
+            return patterns
+        if not kept:
+            return union
+        kept.insert(0, union)
+    return kept or None
+
+_UTC = datetime.timezone.utc
+_now = datetime.datetime.now
+
 def utcnow() -> datetime.datetime:
-    return datetime.datetime.now(datetime.timezone.utc)
+    return _now(_UTC)
+
+def utcnow_ns() -> int:
+    # horodatage brut (epoch, ns) quand un datetime n'est pas nécessaire
+    return time.time_ns()
@@ -1,12 +1,12 @@
 import json
 from types import SimpleNamespace
-from cvskills_extractor.analyzer import RepoAnalyzer
+from cvskills_extractor.analyzer import RepoAnalyzer, pom_artifact_ids, pom_uses_spring_boot, looks_like_k8s
 from cvskills_extractor.github_http import GitHubHTTP
 
 class FakeGH(GitHubHTTP):
     def __init__(self):
         pass
-    def _req(self, url: str):
+    def _req(self, url: str, data=None):
         if url.endswith('/languages'):
             # Strong Python signal; HTML/CSS should be ignored by map_language
             return {'Python': 9000, 'HTML': 1000, 'CSS': 500}
@@ -19,9 +19,12 @@ class FakeGH(GitHubHTTP):
                              {'path': 'pyproject.toml', 'type': 'blob'}]}
         return {}
 
-    def repo_tree(self, owner, repo, ref):
+    def repo_tree(self, owner, repo, ref, pushed_at=None):
         return self._req(f'https://api.github.com/repos/{owner}/{repo}/git/trees/{ref}?recursive=1')
 
+    def get_raw(self, owner, repo, path, ref):
+        return self.get_file(owner, repo, path, ref)
+
     def get_file(self, owner, repo, path, ref):
         if path == 'package.json':
             return json.dumps({
@@ -51,3 +54,77 @@ def test_analyzer_detects_languages_and_hints():
     assert 'TypeScript' in skills
     assert 'FastAPI' in skills
     assert 'Pandas' in skills
+
+class GraphQLGH(FakeGH):
+    # Every content comes from the single GraphQL snapshot; REST file calls must not happen
+    def repo_snapshot(self, owner, repo, ref, paths):
+        self.snapshot_paths = list(paths)
+        files = {p: FakeGH.get_file(self, owner, repo, p, ref) for p in paths}
+        return {'languages': {'Python': 9000, 'HTML': 1000}, 'files': files}
+
+    def get_file(self, owner, repo, path, ref):
+        raise AssertionError(f'unexpected REST fetch: {path}')
+
+def test_analyzer_uses_single_snapshot():
+    gh = GraphQLGH()
+    repo_meta = {'name': 'demo', 'default_branch': 'main', 'stargazers_count': 0, 'forks_count': 0}
+    idx = RepoAnalyzer(gh, 'user', repo_meta).analyze()
+    skills = {s for s, *_ in idx.aggregate()}
+    assert {'Python', 'Kubernetes', 'React', 'FastAPI'} <= skills
+    assert set(gh.snapshot_paths) == {'package.json', 'pyproject.toml', 'k8s/deploy.yaml', 'charts/app/Chart.yaml'}
+
+def test_pom_artifact_ids_streams_dependency_ids_only():
+    pom = """<?xml version="1.0" encoding="UTF-8"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <artifactId>my-app</artifactId>
+  <dependencies>
+    <dependency><groupId>org.springframework.boot</groupId><artifactId>spring-boot-starter-web</artifactId></dependency>
+    <dependency><artifactId>junit</artifactId></dependency>
+  </dependencies>
+</project>"""
+    assert list(pom_artifact_ids(pom, chunk=16)) == ['spring-boot-starter-web', 'junit']
+
+def test_looks_like_k8s_needs_both_keys_in_head():
+    assert looks_like_k8s('apiVersion: v1\nkind: Service\n')
+    assert not looks_like_k8s('kind: Service\nname: x\n')
+    assert not looks_like_k8s('#' * 10000 + '\napiVersion: v1\nkind: Pod\n')
+
+def test_analyzer_uses_prefetched_listing_data():
+    class PrefetchGH(FakeGH):
+        def repo_snapshot(self, owner, repo, ref, paths):
+            raise AssertionError('snapshot should not be needed')
+        def _req(self, url, data=None):
+            if '/git/trees/' in url:
+                return {'tree': [{'path': 'package.json', 'type': 'blob'}]}
+            raise AssertionError(f'unexpected request: {url}')
+    repo_meta = {'name': 'demo', 'default_branch': 'main', 'stargazers_count': 0, 'forks_count': 0,
+                 'languages': {'TypeScript': 100},
+                 'files': {'package.json': json.dumps({'dependencies': {'react': '^18'}})}}
+    skills = {s for s, *_ in RepoAnalyzer(PrefetchGH(), 'user', repo_meta).analyze().aggregate()}
+    assert {'TypeScript', 'React'} <= skills
+
+def test_analyzer_reuses_blobs_cached_by_sha(tmp_path):
+    from cvskills_extractor.cache import HTTPCache
+    class BlobGH(FakeGH):
+        def _req(self, url, data=None):
+            if '/git/trees/' in url:
+                return {'tree': [{'path': 'requirements.txt', 'type': 'blob', 'sha': 'abc123'}]}
+            if url.endswith('/languages'):
+                return {'Python': 100}
+            raise AssertionError(f'unexpected request: {url}')
+        def repo_snapshot(self, owner, repo, ref, paths):
+            assert paths == [], paths   # only languages are still needed
+            return {'languages': {'Python': 100}, 'files': {}}
+    gh = BlobGH()
+    gh.cache = HTTPCache(tmp_path / 'http.db')
+    gh.store_blob('abc123', 'flask==3.0\n')
+    repo_meta = {'name': 'demo', 'default_branch': 'main', 'stargazers_count': 0, 'forks_count': 0}
+    skills = {s for s, *_ in RepoAnalyzer(gh, 'user', repo_meta).analyze().aggregate()}
+    assert 'Flask' in skills
+
+def test_pom_uses_spring_boot_is_memoised_and_tolerates_bad_xml():
+    pom = '<project><dependencies><dependency><artifactId>spring-boot-starter-web</artifactId></dependency></dependencies></project>'
+    pom_uses_spring_boot.cache_clear()
+    assert pom_uses_spring_boot(pom) and pom_uses_spring_boot(pom)
+    assert pom_uses_spring_boot.cache_info().hits == 1
+    assert pom_uses_spring_boot('<project><unclosed>') is False
@@ -0,0 +1,198 @@
+import io, gzip, json, tarfile
+from email.message import Message
+from cvskills_extractor.github_http import GitHubHTTP
+
+class FakeResponse:
+    def __init__(self, status, body=b'', headers=None):
+        self.status = status
+        self._body = io.BytesIO(body)
+        self.headers = Message()
+        for k, v in (headers or {}).items():
+            self.headers[k] = v
+    def read(self, n=-1):
+        return self._body.read(n)
+    def close(self):
+        pass
+
+class FakeConnection:
+    # Scripted HTTPSConnection: pops one response per request, records what was sent
+    instances = []
+    script = []
+    def __init__(self, host, timeout=60):
+        self.host = host
+        self.sent = []
+        FakeConnection.instances.append(self)
+    def request(self, method, target, body=None, headers=None):
+        self.sent.append((method, target, dict(headers or {})))
+    def getresponse(self):
+        return FakeConnection.script.pop(0)
+    def close(self):
+        pass
+
+def test_req_reuses_connection_and_revalidates_with_etag(tmp_path, monkeypatch):
+    FakeConnection.instances = []
+    FakeConnection.script = [
+        FakeResponse(200, json.dumps({'n': 1}).encode(), {'ETag': '"abc"'}),
+        FakeResponse(304),
+    ]
+    monkeypatch.setattr('http.client.HTTPSConnection', FakeConnection)
+    gh = GitHubHTTP('u', 't', cache_path=tmp_path / 'http.db')
+    url = 'https://api.github.com/repos/u/r/languages'
+    assert gh._req(url) == {'n': 1}
+    assert gh._req(url) == {'n': 1}
+    # one keep-alive connection for both calls; second call is conditional
+    assert len(FakeConnection.instances) == 1
+    sent = FakeConnection.instances[0].sent
+    assert [t for _, t, _ in sent] == ['/repos/u/r/languages'] * 2
+    assert 'If-None-Match' not in sent[0][2]
+    assert sent[1][2]['If-None-Match'] == '"abc"'
+
+def test_iter_tarball_streams_only_wanted_files(monkeypatch):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode='w:gz') as tar:
+        for name, text in [('u-r-abc/package.json', '{}'), ('u-r-abc/src/app.js', 'x'), ('u-r-abc/k8s/a.yaml', 'kind: Pod')]:
+            data = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    FakeConnection.instances = []
+    FakeConnection.script = [
+        FakeResponse(302, headers={'Location': 'https://codeload.github.com/u/r/legacy.tar.gz/main?token=x'}),
+        FakeResponse(200, buf.getvalue()),
+    ]
+    monkeypatch.setattr('http.client.HTTPSConnection', FakeConnection)
+    gh = GitHubHTTP('u', 't', cache_path=None)
+    got = dict(gh.iter_tarball('u', 'r', 'main', {'package.json', 'k8s/a.yaml'}.__contains__))
+    assert got == {'package.json': '{}', 'k8s/a.yaml': 'kind: Pod'}
+    # the signed codeload URL must not receive the API credentials
+    api, codeload = FakeConnection.instances
+    assert codeload.host == 'codeload.github.com'
+    assert 'Authorization' in api.sent[0][2] and 'Authorization' not in codeload.sent[0][2]
+
+def test_last_page_reads_link_header():
+    from cvskills_extractor.github_http import last_page
+    link = ('<https://api.github.com/user/repos?per_page=100&page=2>; rel="next", '
+            '<https://api.github.com/user/repos?per_page=100&page=7>; rel="last"')
+    assert last_page(link) == 7
+    assert last_page(None) is None
+
+def test_get_raw_falls_back_to_contents_on_404(monkeypatch):
+    FakeConnection.instances = []
+    FakeConnection.script = [
+        FakeResponse(404, b'404: Not Found'),
+        FakeResponse(200, json.dumps({'encoding': 'base64', 'content': 'ZmFzdGFwaQo='}).encode()),
+    ]
+    monkeypatch.setattr('http.client.HTTPSConnection', FakeConnection)
+    gh = GitHubHTTP('u', 't', cache_path=None)
+    assert gh.get_raw('u', 'r', 'requirements.txt', 'main') == 'fastapi\n'
+    raw, api = FakeConnection.instances
+    assert raw.host == 'raw.githubusercontent.com' and raw.sent[0][1] == '/u/r/main/requirements.txt'
+    assert api.sent[0][1].startswith('/repos/u/r/contents/requirements.txt')
+
+def test_list_repos_graphql_maps_nodes_to_rest_shape():
+    class GQL(GitHubHTTP):
+        def __init__(self):
+            self.username = 'u'
+            self.calls = []
+        def graphql(self, query, variables=None):
+            self.calls.append(dict(variables))
+            node = {'name': 'r%d' % len(self.calls), 'owner': {'login': 'u'}, 'isFork': False, 'isArchived': False,
+                    'stargazerCount': 3, 'forkCount': 1, 'pushedAt': '2024-01-01T00:00:00Z',
+                    'defaultBranchRef': None, 'languages': {'edges': [{'size': 10, 'node': {'name': 'Go'}}]},
+                    'm0': {'text': '{}'}, 'm1': None}
+            last = len(self.calls) == 2
+            return {'viewer': {'repositories': {'pageInfo': {'hasNextPage': not last, 'endCursor': 'c1'},
+                                                'nodes': [node, None]}}}
+    gh = GQL()
+    repos = gh.list_repos()
+    assert [r['name'] for r in repos] == ['r1', 'r2']
+    assert gh.calls == [{'cursor': None}, {'cursor': 'c1'}]
+    r = repos[0]
+    assert r['default_branch'] == 'main' and r['stargazers_count'] == 3
+    assert r['languages'] == {'Go': 10}
+    assert r['files']['package.json'] == '{}' and r['files']['pyproject.toml'] is None
+
+def test_cache_serves_tree_by_pushed_at_and_remembers_404(tmp_path, monkeypatch):
+    FakeConnection.instances = []
+    FakeConnection.script = [
+        FakeResponse(200, json.dumps({'tree': []}).encode(), {'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}),
+        FakeResponse(404, b'{"message": "Not Found"}'),
+    ]
+    monkeypatch.setattr('http.client.HTTPSConnection', FakeConnection)
+    gh = GitHubHTTP('u', 't', cache_path=tmp_path / 'http.db')
+    assert gh.repo_tree('u', 'r', 'main', pushed_at='2024-01-01T00:00:00Z') == {'tree': []}
+    assert gh.repo_tree('u', 'r', 'main', pushed_at='2024-01-01T00:00:00Z') == {'tree': []}
+    for _ in range(2):
+        try:
+            gh.repo_tree('u', 'r', 'master')
+        except RuntimeError as e:
+            assert 'HTTP 404' in str(e)
+    # one tree fetch + one 404: the repeats were answered from the cache
+    assert len(FakeConnection.instances[0].sent) == 2
+    # only the slim pushed_at copy is kept, not the full tree under its URL as well
+    assert gh.cache.get('https://api.github.com/repos/u/r/git/trees/main?recursive=1') is None
+
+def test_cached_tree_keeps_only_blob_entries(tmp_path, monkeypatch):
+    tree = {'sha': 'x', 'truncated': False, 'tree': [
+        {'path': 'src', 'type': 'tree', 'sha': 't1', 'mode': '040000'},
+        {'path': 'src/a.py', 'type': 'blob', 'sha': 'b1', 'mode': '100644', 'size': 3}]}
+    FakeConnection.instances = []
+    FakeConnection.script = [FakeResponse(200, json.dumps(tree).encode())]
+    monkeypatch.setattr('http.client.HTTPSConnection', FakeConnection)
+    gh = GitHubHTTP('u', 't', cache_path=tmp_path / 'http.db')
+    slim = {'tree': [{'path': 'src/a.py', 'type': 'blob', 'sha': 'b1', 'size': 3}]}
+    assert gh.repo_tree('u', 'r', 'main', pushed_at='p') == slim
+    assert gh.repo_tree('u', 'r', 'main', pushed_at='p') == slim
+
+def test_req_decodes_gzip_body(monkeypatch):
+    FakeConnection.instances = []
+    FakeConnection.script = [FakeResponse(200, gzip.compress(b'{"n": 2}'), {'Content-Encoding': 'gzip'})]
+    monkeypatch.setattr('http.client.HTTPSConnection', FakeConnection)
+    gh = GitHubHTTP('u', 't', cache_path=None)
+    assert gh._req('https://api.github.com/repos/u/r/languages') == {'n': 2}
+    assert FakeConnection.instances[0].sent[0][2]['Accept-Encoding'] == 'gzip'
+
+def test_rate_limit_spreads_low_quota_until_reset(monkeypatch):
+    import time
+    monkeypatch.setattr('time.time', lambda: 1000.0)
+    gh = GitHubHTTP('u', 't', cache_path=None)
+    start = time.monotonic()
+    gh._honor_rate_limit({'X-RateLimit-Remaining': '4000', 'X-RateLimit-Reset': '1100'})
+    assert gh.limiter._next <= start
+    gh._honor_rate_limit({'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': '1100'})
+    assert abs(gh.limiter._next - start - 10) < 1
+    assert gh._honor_rate_limit({'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '1100'})
+    assert abs(gh.limiter._next - start - 100) < 1
+
+def test_rate_limit_spacing_is_shared_between_threads(monkeypatch):
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    monkeypatch.setattr('time.time', lambda: 1000.0)
+    gh = GitHubHTTP('u', 't', cache_path=None)
+    start = time.monotonic()
+    low = {'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': '1100'}
+    with ThreadPoolExecutor(8) as ex:
+        list(ex.map(gh._honor_rate_limit, [low] * 8))
+    # 8 responses -> 8 slots of (reset - now) / remaining on one schedule, not 8 private sleeps
+    assert abs(gh.limiter._next - start - 80) < 1
+    out = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '1200'}
+    with ThreadPoolExecutor(8) as ex:
+        list(ex.map(gh._honor_rate_limit, [out] * 8))
+    # exhausted quota: every thread waits for the same reset, the pauses do not add up
+    assert abs(gh.limiter._next - start - 200) < 1
+
+def test_req_retries_after_quota_exhausted_403(monkeypatch):
+    slept = []
+    monkeypatch.setattr('time.sleep', slept.append)
+    monkeypatch.setattr('time.time', lambda: 1000.0)
+    FakeConnection.instances = []
+    FakeConnection.script = [
+        FakeResponse(403, b'{"message": "API rate limit exceeded"}',
+                     {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '1599'}),
+        FakeResponse(200, b'{"n": 3}', {'X-RateLimit-Remaining': '5000'}),
+    ]
+    monkeypatch.setattr('http.client.HTTPSConnection', FakeConnection)
+    gh = GitHubHTTP('u', 't', cache_path=None)
+    assert gh._req('https://api.github.com/repos/u/r/languages') == {'n': 3}
+    assert any(abs(s - 599) < 1 for s in slept)
+    assert len(FakeConnection.instances[0].sent) == 2
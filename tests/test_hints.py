@@ -0,0 +1,29 @@
+import pytest
+from cvskills_extractor import hints
+
+PATHS = [
+    'Dockerfile', 'app/dockerfile', 'charts/app/Chart.yaml', 'scripts/run.sh',
+    'src/main.py', 'README.md', 'dockerfiles/base', 'deploy/db.sqlite',
+]
+
+@pytest.mark.skipif(hints.get_hyperscan_db() is None, reason='hyperscan not installed')
+def test_hyperscan_backend_matches_re_backend():
+    for p in PATHS:
+        assert hints._match_hyperscan(p) == hints._match_re(p), p
+
+def test_basename_tier_matches_regex_semantics():
+    # every literal hint routed to the basename table must agree with its own regex
+    tables = hints.get_hint_tables()
+    for name, ids in tables.basenames.items():
+        for i in ids:
+            pat = tables.compiled[i][0]
+            assert pat.search(name) and pat.search('sub/dir/' + name), (name, pat.pattern)
+    assert 'docker-compose.yml' not in tables.basenames   # (\.[a-z…]+)? is not literal
+    assert ('Go', 1.5) in list(hints.match_file_hints('svc/GO.MOD'))
+
+def test_suffix_tier_matches_regex_semantics():
+    tables = hints.get_hint_tables()
+    assert '.tf' in tables.suffixes and '.k8s.yaml' in tables.suffixes
+    for p in ['infra/main.TF', 'app.k8s.yml', 'run.sh.bak', 'dir.sh/file', 'a..sh', *PATHS]:
+        expected = [(s, w) for pat, s, w in tables.compiled if pat.search(p)]
+        assert list(hints.match_file_hints(p)) == expected, p
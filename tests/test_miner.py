@@ -42,3 +42,52 @@ def test_miner_generates_outputs(tmp_path, monkeypatch):
         assert any(s['skill']=='Python' for s in data['skills'])
     finally:
         os.chdir(cwd)
+
+def test_unchanged_repo_is_served_from_repo_cache(tmp_path, monkeypatch):
+    from cvskills_extractor.cache import RepoSkillCache
+    calls = []
+    def fake_analyze(self):
+        calls.append(self.repo)
+        idx = SkillIndex()
+        idx.add('Python', self.repo, 1.5, 'Lang')
+        idx.add('Docker', self.repo, 2.0, 'File hint: Dockerfile')
+        return idx
+    monkeypatch.setattr('cvskills_extractor.analyzer.RepoAnalyzer.analyze', fake_analyze, raising=True)
+    pm = PortfolioMiner.__new__(PortfolioMiner)
+    pm.gh = FakeGH('u', 't')
+    pm.repo_cache = RepoSkillCache(tmp_path / 'repos.db')
+    r = {'name': 'r1', 'owner': {'login': 'u'}, 'pushed_at': '2024-01-01T00:00:00Z'}
+    first = pm._analyze_one(r)
+    second = pm._analyze_one(r)
+    assert calls == ['r1']
+    assert second.aggregate() == first.aggregate()
+    # a new push invalidates the entry
+    pm._analyze_one(dict(r, pushed_at='2024-02-01T00:00:00Z'))
+    assert calls == ['r1', 'r1']
+
+def test_degraded_analysis_is_not_cached(tmp_path):
+    from cvskills_extractor.cache import RepoSkillCache
+    class FlakyGH(GitHubHTTP):
+        # every read fails on the first run, then GitHub recovers
+        def __init__(self):
+            self.failing = True
+        def repo_tree(self, owner, repo, ref, pushed_at=None):
+            return {'tree': [{'path': 'requirements.txt', 'type': 'blob'}]}
+        def repo_snapshot(self, owner, repo, ref, paths):
+            raise RuntimeError('GraphQL: HTTP 502')
+        def get_raw(self, owner, repo, path, ref):
+            return None if self.failing else 'flask\n'
+        def _req(self, url, data=None, store=True):
+            if self.failing:
+                raise RuntimeError('HTTP 403 on ' + url)
+            return {'Python': 100}
+    pm = PortfolioMiner.__new__(PortfolioMiner)
+    pm.gh = FlakyGH()
+    pm.repo_cache = RepoSkillCache(tmp_path / 'repos.db')
+    r = {'name': 'r1', 'owner': {'login': 'u'}, 'pushed_at': '2024-01-01T00:00:00Z'}
+    assert pm._analyze_one(r).aggregate() == []
+    pm.gh.failing = False
+    skills = {s for s, *_ in pm._analyze_one(r).aggregate()}
+    assert {'Flask', 'Python'} <= skills
+    # the healthy result is the one kept for the next run
+    assert {s for s, *_ in pm._analyze_one(r).aggregate()} == skills
@@ -10,3 +10,44 @@ def test_js_dep_to_skill_core():
     m = SkillRules.JS_DEP_TO_SKILL
     assert m.get('react') == 'React'
     assert m.get('next') == 'Next.js'
+
+def test_dep_tables_are_keyed_lowercase():
+    # analyzer lowercases manifest names once and relies on exact dict hits
+    for table in (SkillRules.PY_DEP_TO_SKILL, SkillRules.JS_DEP_TO_SKILL):
+        assert all(k == k.lower() for k in table)
+
+def test_skill_to_category_keeps_first_category():
+    assert SkillRules.SKILL_TO_CATEGORY['React'] == 'Frameworks & Libs'
+    # OpenAPI/OpenTelemetry are listed twice; display order decides
+    assert SkillRules.SKILL_TO_CATEGORY['OpenAPI'] == 'Build & Outillage'
+    assert SkillRules.SKILL_TO_CATEGORY['OpenTelemetry'] == 'DevOps & Cloud'
+
+def test_lookup_dep_normalises_case():
+    assert SkillRules.lookup_dep('py', 'Django') == 'Django'
+    assert SkillRules.lookup_dep('js', '@Angular/Core') == 'Angular'
+    assert SkillRules.lookup_dep('js', 'left-pad') is None
+
+def test_file_hints_compile_and_match_fixtures():
+    import re
+    for pat, _, _ in SkillRules.FILE_HINTS:
+        assert '\\\\.' not in pat, pat          # a doubled escape matches a literal backslash
+        re.compile(pat, flags=re.VERBOSE)
+    def skills(path):
+        return {s for p, s, _ in SkillRules.compiled_file_hints() if p.search(path)}
+    assert 'Docker' in skills('Dockerfile')
+    assert 'Docker Compose' in skills('docker-compose.yml')
+    assert 'Docker Compose' in skills('deploy/docker-compose.prod.yaml')
+    assert 'GitHub Actions' in skills('.github/workflows/ci.yml')
+    assert 'TypeScript' in skills('tsconfig.base.json') and 'TypeScript' in skills('web/tsconfig.json')
+    assert 'Terraform' in skills('infra/main.tf')
+    assert not skills('src/app/main.py')
+
+def test_file_hints_have_no_duplicate_pattern_skill_pairs():
+    keys = [(p, s) for p, s, _ in SkillRules.FILE_HINTS]
+    assert len(keys) == len(set(keys))
+
+def test_ignored_languages_are_not_lookup_hits():
+    assert 'Markdown' in SkillRules.IGNORED_LANGS
+    assert 'Markdown' not in SkillRules._LANG_MAP
+    assert SkillRules.map_language('Markdown') is None
+    assert SkillRules.map_language('CMake') == 'C++'
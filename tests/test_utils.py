@@ -13,3 +13,51 @@ def test_compile_repo_patterns_from_env(monkeypatch):
     pats = compile_repo_patterns_from_env('EXCLUDE_REPOS')
     assert len(pats) == 2
     assert any(re.compile('^fork-.*', re.I).pattern == p.pattern for p in pats)
+
+def test_is_excluded_case_and_substrings():
+    assert is_excluded('Project/Node_Modules/pkg/index.js')
+    assert is_excluded('static/js/jquery-3.7.1.js')
+    assert is_excluded('assets/min/app.js')
+    assert not is_excluded('src/libraries/main.py')
+
+def test_get_exclude_repo_matcher_fuses_patterns(monkeypatch):
+    from cvskills_extractor.utils import get_exclude_repo_matcher
+    monkeypatch.setenv('EXCLUDE_REPOS_TEST', '^fork-.*, (demo|playground)$')
+    m = get_exclude_repo_matcher('EXCLUDE_REPOS_TEST')
+    assert m.search('Fork-thing') and m.search('my-demo') and not m.search('api')
+    monkeypatch.setenv('EXCLUDE_REPOS_EMPTY', '')
+    assert get_exclude_repo_matcher('EXCLUDE_REPOS_EMPTY') is None
+
+def test_path_excluder_agrees_with_is_excluded():
+    from cvskills_extractor.utils import path_excluder, is_excluded_dir
+    paths = ['node_modules/a/b.js', 'src/vendor', 'assets/min/app.js', 'web/jquery.min.js',
+             'src/app/main.py', 'src/app/util.py', 'Build/out.o', 'README.md', 'libs']
+    excluded = path_excluder()
+    assert [excluded(p) for p in paths] == [is_excluded(p) for p in paths]
+    assert is_excluded_dir('Node_Modules') and not is_excluded_dir('src')
+
+def test_dotenv_needed_only_when_a_key_is_missing(monkeypatch):
+    from cvskills_extractor.utils import dotenv_needed
+    for k in ('GITHUB_USERNAME', 'GITHUB_TOKEN', 'EXCLUDE_REPOS'):
+        monkeypatch.setenv(k, 'x')
+    assert not dotenv_needed()
+    monkeypatch.delenv('EXCLUDE_REPOS')
+    assert dotenv_needed()
+
+def test_get_exclude_repo_matcher_keeps_unfusable_patterns_apart(monkeypatch):
+    from cvskills_extractor.utils import get_exclude_repo_matcher
+    from cvskills_extractor.miner import PortfolioMiner
+    def excluded(value, name):
+        monkeypatch.setenv('EXCLUDE_REPOS_UNFUSABLE', value)
+        get_exclude_repo_matcher.cache_clear()
+        pm = PortfolioMiner.__new__(PortfolioMiner)
+        pm.exclude_repo_patterns = get_exclude_repo_matcher('EXCLUDE_REPOS_UNFUSABLE')
+        return pm._is_repo_excluded(name)
+    # backreferences keep their own numbering
+    assert excluded(r'(a)-\1,(b)-\1', 'b-b') and excluded(r'(a)-\1,(b)-\1', 'a-a')
+    assert not excluded(r'(a)-\1,(b)-\1', 'a-b')
+    # a repeated group name must not break the union compile
+    assert excluded('(?P<n>foo),(?P<n>bar)', 'my-bar') and not excluded('(?P<n>foo),(?P<n>bar)', 'baz')
+    # a leading global flag is valid on its own and stays active
+    assert excluded('(?i)foo,^demo$', 'FOO-api') and excluded('(?i)foo,^demo$', 'demo')
+    get_exclude_repo_matcher.cache_clear()